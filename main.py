@@ -1,9 +1,17 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import json
 import os
 from datetime import datetime
 import aiohttp
+import io
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 import asyncio# ============================================
 # ENVIRONMENT SETUP - Replit Compatible
 # ============================================
@@ -38,7 +46,40 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
-bot = commands.Bot(command_prefix='!', intents=intents, help_command=None)
+# LOW MEMORY MODE - untuk container kecil / bot di banyak server
+# Default discord.py menyimpan semua member tiap guild (chunking saat startup)
+# dan 1000 pesan terakhir. Command bot ini cuma butuh ctx.author, yang sudah
+# ikut di payload pesan, jadi cache itu bisa dimatikan tanpa mengubah perilaku.
+# Perkiraan kasar hemat RAM (belum diukur, tergantung isi server):
+#   - cache member : ~1-2 KB per member (Member + User + roles)
+#                    contoh 100 guild x 500 member = 50rb member ≈ 50-100 MB
+#   - cache pesan  : ~2-5 KB per pesan (isi, embed, attachment, author)
+#                    default 1000 pesan ≈ 2-5 MB
+# Cek angka asli: bandingkan "memory_mb" di /health dengan LOW_MEMORY_MODE=0 vs 1.
+LOW_MEMORY_MODE = os.environ.get('LOW_MEMORY_MODE', '0').lower() in ('1', 'true', 'yes')
+MAX_MESSAGES = int(os.environ.get('MAX_MESSAGES', '0'))  # 0 = cache pesan mati
+
+bot_options = {}
+if LOW_MEMORY_MODE:
+    bot_options = {
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        "chunk_guilds_at_startup": False,
+        "max_messages": MAX_MESSAGES or None
+    }
+    print(f"🪶 Low memory mode aktif (max_messages={MAX_MESSAGES or 'off'})")
+
+bot = commands.Bot(command_prefix='!', intents=intents, help_command=None, **bot_options)
+
+def get_memory_mb():
+    """Resident memory proses (MB), None kalau tidak bisa dibaca (non-Linux)"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
 
 # Storage
 KNOWLEDGE_FILE = 'toram_knowledge.json'
@@ -55,6 +96,51 @@ def save_knowledge(knowledge):
 
 knowledge_base = load_knowledge()
 
+# ============================================
+# KNOWLEDGE SNAPSHOT - COPY-ON-WRITE
+# ============================================
+
+# knowledge_base = working copy untuk writer (command di event loop).
+# Reader (search, list) pakai snapshot immutable yang diganti atomik
+# setiap ada perubahan Q&A, jadi aman dibaca dari thread lain tanpa lock.
+KnowledgeSnapshot = namedtuple('KnowledgeSnapshot', ['version', 'qa_pairs', 'search_index'])
+
+def _freeze(value):
+    """Copy dict/list jadi versi read-only"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def qa_answer_text(qa):
+    """Teks jawaban record: `answer` untuk single, gabungan `answers` untuk multi-answer"""
+    if "answers" in qa:
+        return "\n".join(qa["answers"])
+    return qa["answer"]
+
+def build_snapshot(qa_pairs, version=0):
+    """Buat snapshot immutable dari list Q&A beserta index pencarian"""
+    # Record multi-answer cuma simpan `answers` di disk, `answer` dibentuk di sini
+    frozen = tuple(_freeze({**qa, "answer": qa_answer_text(qa)}) for qa in qa_pairs)
+    search_index = tuple((qa["question"].lower(), qa["answer"].lower()) for qa in frozen)
+    return KnowledgeSnapshot(version, frozen, search_index)
+
+_snapshot = build_snapshot(knowledge_base["qa_pairs"])
+
+def current_snapshot():
+    """Snapshot terbaru (tanpa lock, assignment global itu atomik)"""
+    return _snapshot
+
+def publish_knowledge():
+    """Publish snapshot baru setelah knowledge_base["qa_pairs"] berubah"""
+    global _snapshot
+    _snapshot = build_snapshot(knowledge_base["qa_pairs"], _snapshot.version + 1)
+
+# Worker pool untuk search, biar event loop tidak ke-block
+SEARCH_WORKERS = int(os.environ.get('SEARCH_WORKERS', min(4, os.cpu_count() or 1)))
+search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix='search')
+
 # ============================================
 # SIMPLE SEARCH - NO FILTERING
 # ============================================
@@ -80,20 +166,18 @@ knowledge_base = load_knowledge()
     
 #     return results
 
-def search_knowledge(query):
+def search_knowledge(query, snapshot=None):
     """Search dengan scoring dan limit hasil"""
+    snapshot = snapshot or current_snapshot()
     query_lower = query.lower()
     query_words = [w for w in query_lower.split() if len(w) > 2]  # Skip kata pendek
     
     if not query_words:
-        return knowledge_base["qa_pairs"][:20]  # Fallback
+        return list(snapshot.qa_pairs[:20])  # Fallback
     
     scored_results = []
     
-    for qa in knowledge_base["qa_pairs"]:
-        question_lower = qa["question"].lower()
-        answer_lower = qa["answer"].lower()
-        
+    for qa, (question_lower, answer_lower) in zip(snapshot.qa_pairs, snapshot.search_index):
         score = 0
         # Exact match = prioritas tertinggi
         if query_lower in question_lower:
@@ -183,6 +267,20 @@ def search_knowledge(query):
 #             return f"🤖 Dari database:\n\n{all_data[0]['answer']}\n\n_(AI offline)_"
 #         return f"❌ Error: {str(e)}"
 
+def build_context(all_data, max_items=20, max_context_chars=6000):
+    """Susun context DATABASE untuk prompt, dengan batasan item dan karakter"""
+    context_parts = []
+    total_chars = 0
+    
+    for item in all_data[:max_items]:
+        entry = f"Q: {item['question']}\nA: {item['answer']}"
+        if total_chars + len(entry) > max_context_chars:
+            break
+        context_parts.append(entry)
+        total_chars += len(entry)
+    
+    return "\n\n".join(context_parts) if context_parts else "Tidak ada data relevan"
+
 async def get_ai_response(question, all_data):
     """AI response dengan batasan ketat untuk Replit"""
     # Use global GROQ_API_KEY
@@ -208,18 +306,7 @@ async def get_ai_response(question, all_data):
     limited_data = all_data[:max_items]
     
     # Build context dengan batasan karakter
-    context_parts = []
-    total_chars = 0
-    max_context_chars = 6000  # Kurangi jadi 2000
-    
-    for item in limited_data:
-        entry = f"Q: {item['question']}\nA: {item['answer']}"
-        if total_chars + len(entry) > max_context_chars:
-            break
-        context_parts.append(entry)
-        total_chars += len(entry)
-    
-    context_text = "\n\n".join(context_parts) if context_parts else "Tidak ada data relevan"
+    context_text = build_context(limited_data, max_items=max_items)
     
     try:
         # Timeout ketat untuk Replit
@@ -261,6 +348,7 @@ Jawab berdasarkan database di atas. Jika tidak ada info, bilang tidak tahu."""
             ) as resp:
                 # Debug log
                 print(f"📡 Groq API Response Status: {resp.status}")
+                update_groq_quota(resp)
                 
                 if resp.status == 200:
                     result = await resp.json()
@@ -276,9 +364,7 @@ Jawab berdasarkan database di atas. Jika tidak ada info, bilang tidak tahu."""
                     
                 elif resp.status == 429:
                     print("⚠️ Rate limit Groq API")
-                    if limited_data:
-                        return f"🤖 **Dari database:**\n\n{limited_data[0]['answer']}\n\n_⚠️ API rate limit_"
-                    return "⚠️ API rate limit, coba lagi sebentar!"
+                    return rate_limited_response(limited_data)
                     
                 else:
                     error_text = await resp.text()
@@ -305,6 +391,210 @@ Jawab berdasarkan database di atas. Jika tidak ada info, bilang tidak tahu."""
             return f"🤖 **Dari database:**\n\n{limited_data[0]['answer']}\n\n_⚠️ Fallback mode_"
         return f"❌ Error: {str(e)[:100]}"
 
+# ============================================
+# MICRO-BATCHING - SAAT QUOTA GROQ MENIPIS
+# ============================================
+
+# off = selalu 1 request per pertanyaan
+# auto = batching hanya saat sisa quota <= GROQ_QUOTA_THRESHOLD
+# always = selalu batching
+GROQ_BATCH_MODE = os.environ.get('GROQ_BATCH_MODE', 'off').lower()
+GROQ_BATCH_WINDOW = max(0.0, float(os.environ.get('GROQ_BATCH_WINDOW', '1.5')))  # detik
+GROQ_BATCH_MAX = max(1, int(os.environ.get('GROQ_BATCH_MAX', '5')))
+GROQ_QUOTA_THRESHOLD = int(os.environ.get('GROQ_QUOTA_THRESHOLD', '50'))
+
+groq_quota = {"remaining_requests": None}
+BATCH_RATE_LIMITED = "rate_limited"
+pending_batch = []  # (question, all_data, future)
+batch_flush_handle = None
+
+def update_groq_quota(resp):
+    """Catat sisa quota dari header response Groq"""
+    if resp.status == 429:
+        groq_quota["remaining_requests"] = 0
+        return
+    remaining = resp.headers.get('x-ratelimit-remaining-requests')
+    if remaining is not None and remaining.isdigit():
+        groq_quota["remaining_requests"] = int(remaining)
+
+def batching_active():
+    if GROQ_BATCH_MODE == 'always':
+        return True
+    if GROQ_BATCH_MODE == 'auto':
+        remaining = groq_quota["remaining_requests"]
+        return remaining is not None and remaining <= GROQ_QUOTA_THRESHOLD
+    return False
+
+def rate_limited_response(all_data):
+    """Jawaban dari database lokal saat quota Groq habis"""
+    if all_data:
+        return f"🤖 **Dari database:**\n\n{all_data[0]['answer']}\n\n_⚠️ API rate limit_"
+    return "⚠️ API rate limit, coba lagi sebentar!"
+
+def merge_batch_data(data_lists):
+    """Gabung hasil search beberapa pertanyaan (round-robin, tanpa duplikat)"""
+    merged = []
+    seen = set()
+    for rank in range(max(len(data) for data in data_lists)):
+        for data in data_lists:
+            if rank < len(data):
+                item = data[rank]
+                key = (item['question'], item['answer'])
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(item)
+    return merged
+
+async def get_ai_batch_response(questions, all_data):
+    """Jawab beberapa pertanyaan dalam 1 request.
+    Return {index: jawaban}, None kalau gagal, atau BATCH_RATE_LIMITED kalau kena 429"""
+    groq_api_key = GROQ_API_KEY.strip().replace('\n', '').replace('\r', '')
+    context_text = build_context(all_data, max_items=30, max_context_chars=8000)
+    question_text = "\n".join(f"{i}. {q}" for i, q in enumerate(questions, 1))
+    
+    try:
+        timeout = aiohttp.ClientTimeout(total=25)
+        
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            headers = {
+                "Authorization": f"Bearer {groq_api_key}",
+                "Content-Type": "application/json"
+            }
+            
+            data = {
+                "model": "llama-3.3-70b-versatile",
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": "Kamu AI helper Toram Online. Jawab singkat dan jelas maksimal 300 kata per pertanyaan."
+                    },
+                    {
+                        "role": "user",
+                        "content": f"""DATABASE:
+{context_text}
+
+PERTANYAAN:
+{question_text}
+
+Jawab SETIAP pertanyaan secara terpisah berdasarkan database di atas. Jika tidak ada info, bilang tidak tahu.
+Balas HANYA dengan JSON: {{"answers": [{{"id": <nomor pertanyaan>, "answer": "<jawaban>"}}]}}"""
+                    }
+                ],
+                "temperature": 0.2,
+                "max_tokens": min(600 * len(questions), 3000),
+                "top_p": 0.9,
+                "response_format": {"type": "json_object"}
+            }
+            
+            async with session.post(
+                "https://api.groq.com/openai/v1/chat/completions",
+                headers=headers,
+                json=data
+            ) as resp:
+                print(f"📡 Groq API Batch Response Status: {resp.status} ({len(questions)} pertanyaan)")
+                update_groq_quota(resp)
+                
+                if resp.status == 429:
+                    return BATCH_RATE_LIMITED
+                if resp.status != 200:
+                    return None
+                
+                result = await resp.json()
+                content = result['choices'][0]['message']['content']
+    
+    except Exception as e:
+        print(f"❌ Batch error: {type(e).__name__}: {str(e)}")
+        return None
+    
+    try:
+        parsed = json.loads(content)
+        answers = {}
+        for entry in parsed["answers"]:
+            index = int(entry["id"]) - 1
+            answer = str(entry["answer"]).strip()
+            if 0 <= index < len(questions) and answer:
+                answers[index] = answer[:2000]
+        return answers
+    except (ValueError, KeyError, TypeError) as e:
+        print(f"⚠️ Batch response tidak bisa di-parse: {e}")
+        return None
+
+async def send_batch(batch):
+    """Kirim satu batch pertanyaan, bagi hasilnya ke masing-masing command"""
+    # Pertanyaan identik cukup dijawab sekali
+    groups = {}
+    for question, all_data, future in batch:
+        group = groups.setdefault(question.strip().lower(), {"question": question, "data": all_data, "futures": []})
+        group["futures"].append(future)
+    groups = list(groups.values())
+    
+    try:
+        answers = {}
+        if len(groups) > 1:
+            result = await get_ai_batch_response(
+                [g["question"] for g in groups],
+                merge_batch_data([g["data"] for g in groups])
+            )
+            if result == BATCH_RATE_LIMITED:
+                # Quota habis: jangan tambah request, jawab dari database lokal
+                answers = {i: rate_limited_response(g["data"]) for i, g in enumerate(groups)}
+            else:
+                answers = result or {}
+        
+        # Fallback: yang tidak terjawab di batch, request sendiri-sendiri
+        missing = [i for i in range(len(groups)) if i not in answers]
+        if missing:
+            fallback = await asyncio.gather(*[
+                get_ai_response(groups[i]["question"], groups[i]["data"]) for i in missing
+            ])
+            answers.update(zip(missing, fallback))
+        
+        for i, group in enumerate(groups):
+            for future in group["futures"]:
+                if not future.done():
+                    future.set_result(answers[i])
+    
+    except Exception as e:
+        print(f"❌ Error in send_batch: {type(e).__name__}: {str(e)}")
+        for group in groups:
+            for future in group["futures"]:
+                if not future.done():
+                    future.set_exception(e)
+
+def _take_batch():
+    """Ambil maksimal GROQ_BATCH_MAX pertanyaan dari antrian"""
+    batch = pending_batch[:GROQ_BATCH_MAX]
+    del pending_batch[:GROQ_BATCH_MAX]
+    return batch
+
+def _on_batch_window():
+    """Window batching habis, kirim yang sudah terkumpul"""
+    global batch_flush_handle
+    batch_flush_handle = None
+    while pending_batch:
+        asyncio.ensure_future(send_batch(_take_batch()))
+
+async def answer_question(question, all_data):
+    """Jawab pertanyaan, lewat batch kalau mode batching aktif"""
+    global batch_flush_handle
+    if not GROQ_API_KEY or not batching_active():
+        return await get_ai_response(question, all_data)
+    
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    pending_batch.append((question, all_data, future))
+    
+    if len(pending_batch) >= GROQ_BATCH_MAX:
+        # Batch penuh: pisahkan sekarang juga, pertanyaan berikutnya masuk batch baru
+        if batch_flush_handle is not None:
+            batch_flush_handle.cancel()
+            batch_flush_handle = None
+        asyncio.ensure_future(send_batch(_take_batch()))
+    elif batch_flush_handle is None:
+        batch_flush_handle = loop.call_later(GROQ_BATCH_WINDOW, _on_batch_window)
+    
+    return await future
+
 # ============================================
 # IMPORT FROM TXT
 # ============================================
@@ -338,6 +628,7 @@ def load_qa_from_txt(file_path):
                 added += 1
 
     save_knowledge(knowledge_base)
+    publish_knowledge()
     return added
 
 @bot.command(name='importtxt')
@@ -413,8 +704,11 @@ async def ask_ai(ctx, *, question):
     
     async with ctx.typing():
         try:
-            # Get matching data
-            all_data = search_knowledge(question)
+            # Get matching data (di worker pool, pakai snapshot saat ini)
+            loop = asyncio.get_running_loop()
+            all_data = await loop.run_in_executor(
+                search_executor, search_knowledge, question, current_snapshot()
+            )
             
             # Collect images (max 3)
             images_found = []
@@ -426,7 +720,7 @@ async def ask_ai(ctx, *, question):
                             break
             
             # Get AI response
-            response = await get_ai_response(question, all_data)
+            response = await answer_question(question, all_data)
             
             # Create embed
             embed = discord.Embed(
@@ -498,6 +792,7 @@ async def teach_bot(ctx, *, content):
         "timestamp": str(datetime.now())
     })
     save_knowledge(knowledge_base)
+    publish_knowledge()
     
     # Embed response
     embed = discord.Embed(title="✅ Berhasil Dipelajari!", color=0x57F287)
@@ -522,15 +817,16 @@ async def teach_bot(ctx, *, content):
 @bot.command(name='knowledge', aliases=['database', 'db', 'info'])
 async def show_knowledge(ctx):
     """Lihat stats knowledge base"""
-    qa_count = len(knowledge_base["qa_pairs"])
+    qa_pairs = current_snapshot().qa_pairs
+    qa_count = len(qa_pairs)
     
     embed = discord.Embed(title="📚 Toram AI Knowledge Base", color=0x5865F2)
     embed.add_field(name="💬 Q&A", value=f"{qa_count} pasangan", inline=True)
     
-    if knowledge_base["qa_pairs"]:
+    if qa_pairs:
         recent = "\n".join([
             f"• {qa['question'][:50]}..." if len(qa['question']) > 50 else f"• {qa['question']}"
-            for qa in knowledge_base["qa_pairs"][-5:]
+            for qa in qa_pairs[-5:]
         ])
         embed.add_field(name="🆕 Q&A Terbaru", value=recent or "Kosong", inline=False)
     
@@ -540,7 +836,8 @@ async def show_knowledge(ctx):
 async def list_qa(ctx, page: int = 1):
     """List semua Q&A (paginated)"""
     per_page = 10
-    total = len(knowledge_base["qa_pairs"])
+    qa_pairs = current_snapshot().qa_pairs
+    total = len(qa_pairs)
     
     if total == 0:
         await ctx.reply("📭 Belum ada Q&A. Ajari aku pakai `!teach`")
@@ -551,7 +848,7 @@ async def list_qa(ctx, page: int = 1):
     
     start = (page - 1) * per_page
     end = start + per_page
-    qa_list = knowledge_base["qa_pairs"][start:end]
+    qa_list = qa_pairs[start:end]
     
     embed = discord.Embed(
         title=f"📋 Daftar Q&A (Halaman {page}/{max_page})",
@@ -575,6 +872,7 @@ async def delete_qa(ctx, index: int):
     if 1 <= index <= len(knowledge_base["qa_pairs"]):
         deleted = knowledge_base["qa_pairs"].pop(index - 1)
         save_knowledge(knowledge_base)
+        publish_knowledge()
         await ctx.reply(f"✅ Dihapus: **{deleted['question']}**")
     else:
         await ctx.reply(f"❌ Index {index} tidak valid! Lihat pakai `!list`")
@@ -587,8 +885,143 @@ async def reset_knowledge(ctx):
     knowledge_base["documents"] = []
     knowledge_base["conversations"] = []
     save_knowledge(knowledge_base)
+    publish_knowledge()
     await ctx.reply("🗑️ Semua data direset!")
 
+# ============================================
+# COMPACTION - GABUNG PERTANYAAN DUPLIKAT
+# ============================================
+
+# Interval compaction otomatis (jam), 0 = hanya lewat !compact
+AUTO_COMPACT_HOURS = float(os.environ.get('AUTO_COMPACT_HOURS', '0') or 0)
+
+def normalize_question(question):
+    """Normalisasi pertanyaan: lowercase + rapikan spasi"""
+    return " ".join(question.lower().split())
+
+def _qa_sources(qa):
+    """Ambil (jawaban, taught_by, timestamp) dari record single atau multi-answer"""
+    if "answers" not in qa:
+        return [(qa["answer"], qa.get("taught_by", "unknown"), qa.get("timestamp", ""))]
+
+    answers = qa["answers"]
+    sources = []
+    used = set()
+    for src in qa.get("sources", []):
+        if not isinstance(src, dict):
+            continue
+        indexes = src.get("answers", [])
+        if not isinstance(indexes, list):
+            continue
+        for index in indexes:
+            if isinstance(index, int) and 0 <= index < len(answers):
+                used.add(index)
+                sources.append((answers[index], src.get("taught_by", "unknown"), src.get("timestamp", "")))
+
+    # Jawaban tanpa provenance valid (mis. JSON diedit manual) tetap dipertahankan
+    for index, answer in enumerate(answers):
+        if index not in used:
+            sources.append((answer, qa.get("taught_by", "unknown"), qa.get("timestamp", "")))
+    return sources
+
+def compact_qa_pairs(qa_pairs):
+    """Gabung Q&A dengan pertanyaan sama jadi satu record multi-answer"""
+    groups = {}
+    for qa in qa_pairs:
+        groups.setdefault(normalize_question(qa["question"]), []).append(qa)
+
+    compacted = []
+    for items in groups.values():
+        if len(items) == 1 and "answers" not in items[0]:
+            compacted.append(items[0])
+            continue
+
+        # Jawaban identik disimpan sekali; provenance dikelompokkan per
+        # (taught_by, timestamp) dengan daftar index jawaban
+        answers = []
+        images = []
+        sources = {}
+        for qa in items:
+            for img in qa.get("images", []):
+                if img not in images:
+                    images.append(img)
+            for answer, taught_by, timestamp in _qa_sources(qa):
+                answer = answer.strip()
+                if answer not in answers:
+                    answers.append(answer)
+                src = sources.setdefault((taught_by, timestamp), {
+                    "taught_by": taught_by,
+                    "timestamp": timestamp,
+                    "answers": []
+                })
+                if answers.index(answer) not in src["answers"]:
+                    src["answers"].append(answers.index(answer))
+
+        record = {"question": items[0]["question"], "answers": answers}
+        if images:
+            record["images"] = images
+        record["sources"] = list(sources.values())
+        compacted.append(record)
+
+    return compacted
+
+def run_compaction():
+    """Compact knowledge base, return statistik sebelum/sesudah"""
+    before_count = len(knowledge_base["qa_pairs"])
+    before_bytes = len(json.dumps(knowledge_base["qa_pairs"], ensure_ascii=False, indent=2))
+
+    compacted = compact_qa_pairs(knowledge_base["qa_pairs"])
+    changed = compacted != knowledge_base["qa_pairs"]
+    knowledge_base["qa_pairs"] = compacted
+
+    after_count = len(knowledge_base["qa_pairs"])
+    after_bytes = len(json.dumps(knowledge_base["qa_pairs"], ensure_ascii=False, indent=2))
+
+    if changed:
+        save_knowledge(knowledge_base)
+        publish_knowledge()
+
+    return {
+        "before_count": before_count,
+        "after_count": after_count,
+        "before_bytes": before_bytes,
+        "after_bytes": after_bytes
+    }
+
+@bot.command(name='compact')
+@commands.has_permissions(administrator=True)
+async def compact_knowledge(ctx):
+    """Gabung Q&A duplikat jadi multi-answer (Admin only)"""
+    stats = run_compaction()
+
+    diff_count = stats["after_count"] - stats["before_count"]
+    diff_bytes = stats["after_bytes"] - stats["before_bytes"]
+
+    embed = discord.Embed(title="🗜️ Compaction Selesai", color=0x57F287)
+    embed.add_field(
+        name="💬 Q&A",
+        value=f"{stats['before_count']} → {stats['after_count']} ({diff_count:+d})",
+        inline=True
+    )
+    embed.add_field(
+        name="💾 Ukuran",
+        value=f"{stats['before_bytes'] / 1024:.1f} KB → {stats['after_bytes'] / 1024:.1f} KB ({diff_bytes / 1024:+.1f} KB)",
+        inline=True
+    )
+    await ctx.reply(embed=embed)
+
+@tasks.loop(hours=max(AUTO_COMPACT_HOURS, 1))
+async def auto_compact():
+    try:
+        stats = run_compaction()
+    except Exception as e:
+        # Jangan sampai 1 record rusak menghentikan loop
+        print(f"❌ Error in auto_compact: {type(e).__name__}: {str(e)}")
+        return
+    if stats["after_count"] != stats["before_count"]:
+        print(f"🗜️ Auto compaction: {stats['before_count']} → {stats['after_count']} Q&A "
+              f"({stats['before_bytes']} → {stats['after_bytes']} bytes)")
+
 # ============================================
 # HELP COMMAND
 # ============================================
@@ -616,7 +1049,7 @@ async def help_command(ctx):
     
     embed.add_field(
         name="📊 Database",
-        value="`!knowledge` - Info database\n`!delete <nomor>` - Hapus data\n`!reset` - Reset database (Admin)",
+        value="`!knowledge` - Info database\n`!delete <nomor>` - Hapus data\n`!compact` - Gabung Q&A duplikat (Admin)\n`!reset` - Reset database (Admin)",
         inline=False
     )
     
@@ -661,6 +1094,150 @@ async def test_api(ctx):
     except Exception as e:
         await ctx.reply(f"❌ Connection Error:\n```{str(e)[:500]}```")
 
+# ============================================
+# PROFILER (Admin)
+# ============================================
+
+PROFILE_MAX_SECONDS = 60
+PROFILE_SAMPLE_INTERVAL = 0.005  # 5ms per sample
+profile_lock = asyncio.Lock()
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _profiled_threads(loop_thread):
+    """Thread yang di-profile: event loop + worker search"""
+    ids = {loop_thread}
+    for t in threading.enumerate():
+        if t.name.startswith('search'):
+            ids.add(t.ident)
+    return ids
+
+def sample_cpu(loop_thread, duration, interval=PROFILE_SAMPLE_INTERVAL):
+    """Sampling profiler: intip stack thread target tiap `interval` detik"""
+    self_counts = Counter()
+    total_counts = Counter()
+    samples = 0
+    end = time.monotonic() + duration
+
+    while time.monotonic() < end:
+        frames = sys._current_frames()
+        for thread_id in _profiled_threads(loop_thread):
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            samples += 1
+            self_counts[_frame_label(frame)] += 1
+            seen = set()
+            while frame is not None:
+                label = _frame_label(frame)
+                if label not in seen:
+                    total_counts[label] += 1
+                    seen.add(label)
+                frame = frame.f_back
+        del frames
+        time.sleep(interval)
+
+    return samples, self_counts, total_counts
+
+def format_profile_report(duration, cpu_result=None, mem_stats=None, top=15):
+    """Susun laporan profiler jadi teks"""
+    lines = [
+        "Toram AI Bot - Profile Report",
+        f"Waktu   : {datetime.now()}",
+        f"Durasi  : {duration}s",
+        ""
+    ]
+
+    if cpu_result is not None:
+        samples, self_counts, total_counts = cpu_result
+        lines.append(f"=== CPU (sampling, {samples} sampel @ {PROFILE_SAMPLE_INTERVAL * 1000:.0f}ms) ===")
+        if samples:
+            lines.append("-- Self (fungsi yang sedang jalan) --")
+            for label, count in self_counts.most_common(top):
+                lines.append(f"{count / samples * 100:6.1f}%  {label}")
+            lines.append("")
+            lines.append("-- Total (termasuk fungsi yang dipanggil) --")
+            for label, count in total_counts.most_common(top):
+                lines.append(f"{count / samples * 100:6.1f}%  {label}")
+        else:
+            lines.append("Tidak ada sampel")
+        lines.append("")
+
+    if mem_stats is not None:
+        lines.append("=== MEMORY (tracemalloc, alokasi selama profiling) ===")
+        if mem_stats:
+            for stat in mem_stats[:top]:
+                frame = stat.traceback[0]
+                lines.append(
+                    f"{stat.size_diff / 1024:+10.1f} KiB  {stat.count_diff:+6d} blok  "
+                    f"{frame.filename}:{frame.lineno}"
+                )
+        else:
+            lines.append("Tidak ada alokasi baru")
+        lines.append("")
+
+    return "\n".join(lines)
+
+@bot.command(name='profile')
+@commands.has_permissions(administrator=True)
+async def profile_bot(ctx, *args):
+    """Profiling CPU/memory bot yang sedang jalan (Admin only)"""
+    # Urutan argumen bebas: !profile 30 cpu / !profile cpu 30 / !profile mem
+    seconds = 10
+    mode = "all"
+    for arg in args:
+        if arg.isdigit():
+            seconds = int(arg)
+        elif arg.lower() in ("cpu", "mem", "all"):
+            mode = arg.lower()
+        else:
+            await ctx.reply("❌ Format: `!profile [detik] [cpu|mem|all]`")
+            return
+
+    if profile_lock.locked():
+        await ctx.reply("⏳ Profiling lain masih berjalan, tunggu sebentar!")
+        return
+
+    seconds = max(1, min(seconds, PROFILE_MAX_SECONDS))
+
+    async with profile_lock:
+        await ctx.reply(f"🔬 Profiling `{mode}` selama {seconds} detik...")
+
+        # Profiler cuma aktif selama window ini, di luar itu tidak ada overhead
+        started_tracemalloc = False
+        mem_before = None
+        if mode in ("mem", "all"):
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracemalloc = True
+            mem_before = tracemalloc.take_snapshot()
+
+        try:
+            cpu_result = None
+            if mode in ("cpu", "all"):
+                # Sampler jalan di thread lain supaya event loop tetap kerja normal
+                loop_thread = threading.get_ident()
+                cpu_result = await asyncio.to_thread(sample_cpu, loop_thread, seconds)
+            else:
+                await asyncio.sleep(seconds)
+
+            mem_stats = None
+            if mem_before is not None:
+                mem_after = tracemalloc.take_snapshot()
+                mem_stats = mem_after.compare_to(mem_before, 'lineno')
+        finally:
+            if started_tracemalloc:
+                tracemalloc.stop()
+
+    report = format_profile_report(seconds, cpu_result, mem_stats)
+    file = discord.File(
+        io.BytesIO(report.encode('utf-8')),
+        filename=f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+    )
+    await ctx.reply("✅ Profiling selesai!", file=file)
+
 # ============================================
 # BOT EVENTS
 # ============================================
@@ -686,8 +1263,13 @@ async def on_ready():
     print(f'📚 Knowledge: {len(knowledge_base["qa_pairs"])} Q&A')
     print(f'🌍 Groq API: {"✅ Configured" if os.environ.get("GROQ_API_KEY") else "❌ Missing"}')
     print(f'🔑 Discord Token: {"✅ Set" if os.environ.get("DISCORD_TOKEN") else "❌ Missing"}')
+    print(f'🪶 Low Memory Mode: {"✅ On" if LOW_MEMORY_MODE else "❌ Off"} | RAM: {get_memory_mb()} MB')
     print('='*50)
     
+    if AUTO_COMPACT_HOURS > 0 and not auto_compact.is_running():
+        auto_compact.change_interval(hours=AUTO_COMPACT_HOURS)
+        auto_compact.start()
+    
     await bot.change_presence(
         activity=discord.Activity(
             type=discord.ActivityType.watching,
@@ -699,6 +1281,8 @@ async def on_ready():
 async def on_command_error(ctx, error):
     if isinstance(error, commands.MissingRequiredArgument):
         await ctx.reply(f"❌ Parameter kurang! Coba `!help`")
+    elif isinstance(error, commands.BadArgument):
+        await ctx.reply(f"❌ Parameter tidak valid! Coba `!help`")
     elif isinstance(error, commands.MissingPermissions):
         await ctx.reply("❌ Kamu gak punya izin!")
     elif isinstance(error, commands.CommandNotFound):
@@ -709,8 +1293,6 @@ async def on_command_error(ctx, error):
 # ============================================
 
 from flask import Flask
-from threading import Thread
-import time
 
 app = Flask('')
 
@@ -723,7 +1305,9 @@ def health():
     return {
         "status": "online",
         "bot": str(bot.user) if bot.is_ready() else "starting...",
-        "guilds": len(bot.guilds) if bot.is_ready() else 0
+        "guilds": len(bot.guilds) if bot.is_ready() else 0,
+        "low_memory_mode": LOW_MEMORY_MODE,
+        "memory_mb": get_memory_mb()
     }
 
 def run():
@@ -735,7 +1319,7 @@ def run():
     app.run(host='0.0.0.0', port=port, debug=False, threaded=True)
 
 def keep_alive():
-    t = Thread(target=run, daemon=True)
+    t = threading.Thread(target=run, daemon=True)
     t.start()
     print("✅ Keep-alive thread started")
     
@@ -781,7 +1365,6 @@ if __name__ == "__main__":
     
     if not DISCORD_TOKEN:
         print("\n❌ DISCORD_TOKEN tidak ditemukan!")
-        import sys
         sys.exit(1)
     else:
         print("🚀 Starting bot...\n")
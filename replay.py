@@ -0,0 +1,165 @@
+"""
+Replay pertanyaan yang sudah di-log ke search_knowledge + build_context.
+
+Dipakai untuk cek perubahan retrieval/caching sebelum deploy:
+latency per query, overlap hasil dengan baseline, dan seberapa sering
+hasil teratas berubah.
+
+Contoh:
+    python replay.py --save baseline.json
+    (ubah kode search)
+    python replay.py --baseline baseline.json
+    python replay.py --kb snapshot.json --log export.jsonl --baseline baseline.json
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+# main.py butuh token saat import, replay tidak connect ke Discord
+os.environ.setdefault('DISCORD_TOKEN', 'replay-offline')
+
+from main import build_context, build_snapshot, search_knowledge
+
+def load_questions(kb, log_files):
+    """Kumpulkan pertanyaan dari conversations KB + file log tambahan"""
+    questions = [c["question"] for c in kb.get("conversations", [])]
+
+    for path in log_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.endswith('.jsonl'):
+                entries = [json.loads(line) for line in f if line.strip()]
+            elif path.endswith('.json'):
+                entries = json.load(f)
+                if isinstance(entries, dict):
+                    entries = entries.get("conversations", [])
+            else:
+                entries = [line.strip() for line in f if line.strip()]
+
+        for entry in entries:
+            question = entry.get("question") if isinstance(entry, dict) else entry
+            if question:
+                questions.append(question)
+
+    return questions
+
+def _key(item):
+    return f"{item['question']}\n{item['answer']}"
+
+def replay(snapshot, questions, repeat=3):
+    """Jalankan semua pertanyaan, return hasil per query"""
+    runs = []
+    for question in questions:
+        search_times = []
+        context_times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = search_knowledge(question, snapshot)
+            mid = time.perf_counter()
+            context = build_context(results)
+            end = time.perf_counter()
+            search_times.append((mid - start) * 1000)
+            context_times.append((end - mid) * 1000)
+
+        runs.append({
+            "question": question,
+            "search_ms": statistics.median(search_times),
+            "context_ms": statistics.median(context_times),
+            "results": [_key(item) for item in results],
+            "top": _key(results[0]) if results else None,
+            "context_chars": len(context)
+        })
+    return runs
+
+def _percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, round(pct / 100 * (len(values) - 1)))
+    return values[index]
+
+def summarize(runs, label):
+    search = [r["search_ms"] for r in runs]
+    context = [r["context_ms"] for r in runs]
+    print(f"📊 {label}: {len(runs)} query")
+    print(f"   search  p50 {_percentile(search, 50):.3f}ms | p95 {_percentile(search, 95):.3f}ms | max {max(search, default=0):.3f}ms")
+    print(f"   context p50 {_percentile(context, 50):.3f}ms | p95 {_percentile(context, 95):.3f}ms | max {max(context, default=0):.3f}ms")
+
+def compare(runs, baseline, verbose=False):
+    """Bandingkan hasil run dengan baseline (dicocokkan per pertanyaan)"""
+    base_by_question = {}
+    for r in baseline:
+        base_by_question.setdefault(r["question"], r)
+
+    overlaps = []
+    top_changed = 0
+    context_changed = 0
+    compared = 0
+
+    for r in runs:
+        base = base_by_question.get(r["question"])
+        if base is None:
+            continue
+        compared += 1
+
+        current, previous = set(r["results"]), set(base["results"])
+        union = current | previous
+        overlap = len(current & previous) / len(union) if union else 1.0
+        overlaps.append(overlap)
+
+        if r["top"] != base["top"]:
+            top_changed += 1
+        if r["context_chars"] != base["context_chars"]:
+            context_changed += 1
+
+        if verbose and (overlap < 1.0 or r["top"] != base["top"]):
+            print(f"   ↔️ {r['question'][:60]!r}: overlap {overlap:.2f}, top {'berubah' if r['top'] != base['top'] else 'sama'}")
+
+    if not compared:
+        print("⚠️ Tidak ada pertanyaan yang sama dengan baseline")
+        return
+
+    base_p50 = _percentile([b["search_ms"] for b in baseline], 50)
+    run_p50 = _percentile([r["search_ms"] for r in runs], 50)
+
+    print(f"🔁 Dibandingkan dengan baseline: {compared} query")
+    print(f"   overlap hasil rata-rata: {statistics.mean(overlaps):.3f} (min {min(overlaps):.3f})")
+    print(f"   hasil teratas berubah  : {top_changed}/{compared} ({top_changed / compared * 100:.1f}%)")
+    print(f"   context berubah        : {context_changed}/{compared}")
+    print(f"   search p50             : {base_p50:.3f}ms → {run_p50:.3f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay pertanyaan ter-log ke search_knowledge")
+    parser.add_argument('--kb', default='toram_knowledge.json', help="File knowledge base (snapshot)")
+    parser.add_argument('--log', action='append', default=[], help="Log tambahan (.json/.jsonl/.txt), bisa berulang")
+    parser.add_argument('--repeat', type=int, default=3, help="Ulangi tiap query N kali, ambil median")
+    parser.add_argument('--save', help="Simpan hasil run ke file (untuk baseline)")
+    parser.add_argument('--baseline', help="File hasil run sebelumnya untuk dibandingkan")
+    parser.add_argument('--verbose', action='store_true', help="Tampilkan query yang hasilnya berubah")
+    args = parser.parse_args()
+
+    with open(args.kb, 'r', encoding='utf-8') as f:
+        kb = json.load(f)
+
+    snapshot = build_snapshot(kb["qa_pairs"])
+    questions = load_questions(kb, args.log)
+    if not questions:
+        print("📭 Tidak ada pertanyaan untuk di-replay")
+        return
+
+    runs = replay(snapshot, questions, repeat=max(1, args.repeat))
+    summarize(runs, f"Replay {args.kb} ({len(snapshot.qa_pairs)} Q&A)")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["runs"]
+        compare(runs, baseline, verbose=args.verbose)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({"kb": args.kb, "timestamp": time.time(), "runs": runs}, f, ensure_ascii=False, indent=2)
+        print(f"💾 Hasil disimpan ke {args.save}")
+
+if __name__ == "__main__":
+    main()